@@ -23,21 +23,42 @@ Notes:
   - "Same schedule" is defined by a canonical signature built from each meter's
     set of (days, from_time, to_time, time_limit_min, meter_state, schedule_type, applied_rule, cap_color).
     You can adjust the signature fields with --signature-fields if needed.
-  - Spatial clustering uses DBSCAN with haversine distance if scikit-learn is available.
-    Otherwise, it falls back to a simple O(N^2) union-find within each schedule group.
+  - schedule_hash is a BLAKE2b-128 digest of that signature; treat it as an opaque id.
+  - Spatial clustering links meters within the radius using a BallTree neighbor
+    query on unit-sphere chord distance if scikit-learn is available, otherwise
+    a spatial grid of radius-sized cells (numba-compiled when available) that only
+    compares neighboring cells, and merges the links with union-find within each
+    schedule group.
   - The default radius is 20 meters. Adjust with --radius-m to be more or less strict.
 """
 
 import argparse
+import csv
 import hashlib
 import json
-import math
 import sys
-from collections import Counter, defaultdict
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import defaultdict
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    from sklearn.neighbors import BallTree
+except ImportError:  # scikit-learn is optional
+    BallTree = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional
+    pa = None
+
 EARTH_RADIUS_M = 6371000.0
 
 DAY_ORDER = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
@@ -47,43 +68,29 @@ DAY_MAP_LONG2ABBR = {
 }
 
 
-def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Great-circle distance in meters between two WGS84 points."""
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+def haversine_vec(lat1, lon1, lat2_arr, lon2_arr) -> np.ndarray:
+    """Great-circle distances in meters from (lat1, lon1) to arrays of WGS84 points."""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2_arr)
     dphi = phi2 - phi1
-    dlambda = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2)**2
-    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
-
-
-def norm_time(t: Optional[str]) -> str:
-    """Normalize times like '7:00 AM' or '07:00' to 'HH:MM'. Unknown -> ''."""
-    if t is None:
-        return ""
-    s = str(t).strip()
-    if not s or s.lower() in {"nan", "none"}:
-        return ""
-    # Try 24h first
-    try:
-        hh, mm = s.split(":")
-        hh = int(hh)
-        if "am" in s.lower() or "pm" in s.lower():
-            raise ValueError  # handled below
-        # guard
-        if 0 <= hh <= 23:
-            return f"{hh:02d}:{int(mm):02d}"
-    except Exception:
-        pass
-    # Try 12h clock
-    import datetime as _dt
+    dlambda = np.radians(np.subtract(lon2_arr, lon1))
+    a = np.sin(dphi / 2)**2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2)**2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def norm_times(times: pd.Series) -> pd.Series:
+    """
+    Normalize times like '7:00 AM' or '07:00' to 'HH:MM', column-wise.
+    Empty/'nan'/'none' -> '', anything unparseable is kept as given (stripped).
+    """
+    s = times.fillna("").astype(str).str.strip()
+    # Try 24h first, then fill the gaps with the 12h clock formats
+    t = pd.to_datetime(s, format="%H:%M", errors="coerce")
     for fmt in ("%I:%M %p", "%I %p"):
-        try:
-            dt = _dt.datetime.strptime(s, fmt)
-            return dt.strftime("%H:%M")
-        except ValueError:
-            continue
-    # Give up
-    return s
+        m = t.isna()
+        t[m] = pd.to_datetime(s[m], format=fmt, errors="coerce")
+    out = t.dt.strftime("%H:%M").where(t.notna(), s)
+    return out.mask(s.str.lower().isin(["", "nan", "none"]), "")
 
 
 def canonical_days(days_str: Optional[str], fallback_day_long: Optional[str] = None) -> str:
@@ -109,105 +116,226 @@ def canonical_days(days_str: Optional[str], fallback_day_long: Optional[str] = N
     return ""
 
 
-def build_schedule_signature(meter_df: pd.DataFrame,
-                             fields: Sequence[str]) -> Tuple[str, List[Dict[str, str]]]:
+def _json_values(values: pd.Series) -> pd.Series:
+    """JSON-encode a string column, encoding each distinct value only once."""
+    return values.map({v: json.dumps(v) for v in values.unique()})
+
+
+def schedule_signatures(df: pd.DataFrame, fields: Sequence[str]) -> pd.DataFrame:
     """
-    From all rows for one meter (post_id), create a canonical set of schedule entries,
-    then return a (hash, pretty_entries) pair.
+    For every post_id, create the canonical set of schedule entries from all of its rows,
+    then return a frame indexed by post_id with schedule_hash and schedule_json columns.
     """
-    entries: List[Dict[str, str]] = []
-    for _, r in meter_df.iterrows():
-        # Handle days normalization; support either 'days' or 'day'
-        days = canonical_days(r.get("days"), r.get("day"))
-        rec = {}
-        for f in fields:
-            if f == "days":
-                rec["days"] = days
-            elif f == "from_time":
-                rec["from_time"] = norm_time(r.get("from_time"))
-            elif f == "to_time":
-                rec["to_time"] = norm_time(r.get("to_time"))
-            else:
-                v = r.get(f)
-                rec[f] = "" if v is None else str(v)
-        entries.append(rec)
+    blank = pd.Series("", index=df.index)
+
+    def col(name: str) -> pd.Series:
+        return df[name].fillna("").astype(str) if name in df.columns else blank
+
+    # Per-row entry, serialized exactly like json.dumps(entry, sort_keys=True)
+    sig_row = None
+    for f in sorted(set(fields)):
+        if f == "days":
+            # Handle days normalization; support either 'days' or 'day'
+            days = col("days")
+            v = days.map({d: canonical_days(d) for d in days.unique()})
+            fallback = col("day").str.strip().str.lower().map(DAY_MAP_LONG2ABBR).fillna("")
+            v = v.where(days.str.strip() != "", fallback)
+        elif f in ("from_time", "to_time"):
+            v = norm_times(col(f))
+        else:
+            v = col(f)
+        part = json.dumps(f) + ": " + _json_values(v)
+        sig_row = part if sig_row is None else sig_row + ", " + part
+    sig_row = "{" + sig_row + "}" if sig_row is not None else pd.Series("{}", index=df.index)
 
     # Deduplicate identical entries then sort stably for deterministic hash
-    uniq = {json.dumps(e, sort_keys=True) for e in entries}
-    entries_sorted = [json.loads(s) for s in sorted(uniq)]
-    raw = json.dumps(entries_sorted, sort_keys=True, ensure_ascii=False)
-    h = hashlib.sha1(raw.encode("utf-8")).hexdigest()
-    return h, entries_sorted
+    per_post = sig_row.groupby(df["post_id"], sort=False).agg(lambda s: tuple(sorted(set(s))))
+
+    # Many meters share a schedule, so hash each distinct entry set only once
+    by_sig = {}
+    for t in set(per_post):
+        entries_sorted = [json.loads(e) for e in t]
+        raw = json.dumps(entries_sorted, sort_keys=True, ensure_ascii=False)
+        by_sig[t] = (hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest(),
+                     json.dumps(entries_sorted, ensure_ascii=False))
+    return pd.DataFrame([by_sig[t] for t in per_post], index=per_post.index,
+                        columns=["schedule_hash", "schedule_json"])
 
 
 class UnionFind:
     def __init__(self, n: int):
         self.p = list(range(n))
-        self.r = [0]*n
     def find(self, x: int) -> int:
+        # path halving
         while self.p[x] != x:
             self.p[x] = self.p[self.p[x]]
             x = self.p[x]
         return x
     def union(self, a: int, b: int):
         ra, rb = self.find(a), self.find(b)
-        if ra == rb: return
-        if self.r[ra] < self.r[rb]:
+        if ra != rb:
             self.p[ra] = rb
-        elif self.r[ra] > self.r[rb]:
-            self.p[rb] = ra
-        else:
-            self.p[rb] = ra
-            self.r[ra] += 1
 
 
-def cluster_points_haversine(lats: List[float], lons: List[float], radius_m: float) -> List[int]:
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _haversine_nb(phi1: float, lam1: float, phi2: float, lam2: float) -> float:
+        """Great-circle distance in meters between two points given in radians."""
+        a = np.sin((phi2 - phi1) / 2)**2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2)**2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+    @njit(cache=True)
+    def _find_nb(parent: np.ndarray, x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    @njit(cache=True, fastmath=True)
+    def _cluster_uf(phi: np.ndarray, lam: np.ndarray, gy: np.ndarray, gx: np.ndarray,
+                    radius_m: float) -> np.ndarray:
+        """
+        Union-find over points in radians sorted by grid cell (gy, gx); only pairs in the
+        same or adjacent cells are measured. Returns each point's root (sorted positions).
+        """
+        n = phi.shape[0]
+        parent = np.arange(n)
+        for i in range(n):
+            j = i + 1
+            while j < n and gy[j] <= gy[i] + 1:
+                if abs(gx[j] - gx[i]) <= 1 and _haversine_nb(phi[i], lam[i], phi[j], lam[j]) <= radius_m:
+                    ri, rj = _find_nb(parent, i), _find_nb(parent, j)
+                    if ri != rj:
+                        parent[ri] = rj
+                j += 1
+        for i in range(n):
+            parent[i] = _find_nb(parent, i)
+        return parent
+
+
+def _grid_cells(lat_arr: np.ndarray, lon_arr: np.ndarray, radius_m: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bucket points into square cells at least radius_m wide on an equirectangular
+    projection, so any two points within radius_m share a cell or are in adjacent cells.
+    """
+    m_per_deg = EARTH_RADIUS_M * np.pi / 180
+    cell = max(radius_m, 1.0) * 1.01  # slack for the flat projection
+    # Scale longitude at the highest latitude present so east-west gaps are never overstated
+    lon_scale = m_per_deg * np.cos(np.radians(np.abs(lat_arr).max()))
+    gy = np.floor(lat_arr * m_per_deg / cell).astype(np.int64)
+    gx = np.floor(lon_arr * lon_scale / cell).astype(np.int64)
+    return gy, gx
+
+
+def _labels_from_roots(roots: np.ndarray) -> List[int]:
+    """Relabel union-find roots to 0..K-1 in order of first appearance."""
+    _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    order = np.empty(len(first), dtype=np.int64)
+    order[np.argsort(first)] = np.arange(len(first))
+    return order[inverse].tolist()
+
+
+def cluster_points_haversine(X: np.ndarray, radius_m: float) -> List[int]:
     """
-    Cluster points using DBSCAN(haversine) if available, else union-find O(N^2).
+    Cluster (N, 2) [latitude, longitude] points in degrees whose haversine distance
+    is within radius_m (single linkage).
+    Neighbor lists come from a euclidean BallTree over unit-sphere (x, y, z)
+    coordinates if scikit-learn is available, else from a grid of radius-sized cells
+    where only neighboring cells are compared; components are then merged with
+    union-find. Without scikit-learn but with numba, a compiled sweep over the
+    grid-sorted points + union-find is used instead.
     Returns an array of labels 0..K-1.
     """
-    n = len(lats)
+    n = len(X)
     if n == 0:
         return []
-    # Try scikit-learn
-    try:
-        from sklearn.cluster import DBSCAN
-        import numpy as np
-        X = np.radians(np.column_stack([lats, lons]))
-        eps = radius_m / EARTH_RADIUS_M  # radians
-        labels = DBSCAN(eps=eps, min_samples=1, metric="haversine").fit_predict(X)
-        # Reindex labels to 0..K-1
-        uniq = {lab: i for i, lab in enumerate(sorted(set(labels)))}
-        return [uniq[lab] for lab in labels]
-    except Exception:
-        pass
-
-    # Fallback: union-find with pairwise comparisons
+    lat_arr = X[:, 0]
+    lon_arr = X[:, 1]
+
+    if BallTree is not None:
+        # Project onto the unit sphere once so the tree compares plain euclidean
+        # (chord) distances with no trig per candidate pair. Chord length is
+        # monotone in great-circle distance, so the radius semantics are kept.
+        phi = np.radians(lat_arr)
+        lam = np.radians(lon_arr)
+        X3 = np.column_stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+        eps_chord = 2 * np.sin(radius_m / (2 * EARTH_RADIUS_M))
+        tree = BallTree(X3, metric="euclidean")
+        neigh = tree.query_radius(X3, r=eps_chord)
+    elif njit is not None:
+        # Fallback: compiled sweep over points sorted by grid cell + union-find
+        gy, gx = _grid_cells(lat_arr, lon_arr, radius_m)
+        order = np.lexsort((gx, gy))
+        roots = _cluster_uf(np.radians(lat_arr[order]), np.radians(lon_arr[order]),
+                            gy[order], gx[order], radius_m)
+        orig_roots = np.empty(n, dtype=np.int64)
+        orig_roots[order] = order[roots]
+        return _labels_from_roots(orig_roots)
+    else:
+        # Fallback: measure each grid cell's points against the 3x3 block of cells around it
+        gy, gx = _grid_cells(lat_arr, lon_arr, radius_m)
+        cells = defaultdict(list)
+        for i, key in enumerate(zip(gy.tolist(), gx.tolist())):
+            cells[key].append(i)
+        neigh = [None] * n
+        for (cy, cx), members in cells.items():
+            cand = np.array([j for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                             for j in cells.get((cy + dy, cx + dx), ())])
+            m = np.array(members)
+            d = haversine_vec(lat_arr[m][:, None], lon_arr[m][:, None], lat_arr[cand], lon_arr[cand])
+            for i, row in zip(members, d):
+                neigh[i] = cand[row <= radius_m]
+
     uf = UnionFind(n)
-    for i in range(n):
-        for j in range(i+1, n):
-            d = haversine_m(lats[i], lons[i], lats[j], lons[j])
-            if d <= radius_m:
-                uf.union(i, j)
+    for i, nbrs in enumerate(neigh):
+        for j in nbrs:
+            if j > i:
+                uf.union(i, int(j))
     # Collapse to labels 0..K-1
-    roots = [uf.find(i) for i in range(n)]
-    uniq = {}
-    next_id = 0
-    labels = []
-    for r in roots:
-        if r not in uniq:
-            uniq[r] = next_id
-            next_id += 1
-        labels.append(uniq[r])
-    return labels
-
-
-def mode(values: Iterable[str]) -> str:
-    vals = [v for v in values if v and str(v).strip()]
-    if not vals:
-        return ""
-    c = Counter(vals).most_common(1)[0][0]
-    return c
+    return _labels_from_roots(np.array([uf.find(i) for i in range(n)]))
+
+
+def read_csv_strings(path: str) -> pd.DataFrame:
+    """
+    Read a CSV with every column as text and empty cells as ''.
+    With pyarrow, uses its multithreaded reader and Arrow-backed strings; column types
+    are pinned to string up front so values like '09:00' are never inferred as times.
+    """
+    if pa is None:
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    names = pa_csv.open_csv(path).schema.names
+    table = pa_csv.read_csv(
+        path,
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={n: pa.string() for n in names},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+
+def group_modes(df: pd.DataFrame, by: str, cols: Sequence[str]) -> pd.DataFrame:
+    """
+    Most common non-blank value of each column within each group of `by` ('' if none),
+    indexed by group key in order of first appearance. Ties go to the value seen first.
+    """
+    keys = pd.unique(df[by])
+    pos = np.arange(len(df))
+    modes = {}
+    for c in cols:
+        if c not in df.columns:
+            modes[c] = pd.Series("", index=keys)
+            continue
+        v = df[c]
+        ok = (v.notna() & (v.astype(str).str.strip() != "")).to_numpy()
+        counts = (pd.DataFrame({"key": df[by].to_numpy()[ok], "val": v.to_numpy()[ok], "pos": pos[ok]})
+                  .groupby(["key", "val"], sort=False)["pos"].agg(["size", "min"])
+                  .reset_index()
+                  .sort_values(["size", "min"], ascending=[False, True]))
+        modes[c] = counts.drop_duplicates("key").set_index("key")["val"].reindex(keys).fillna("")
+    return pd.DataFrame(modes, index=keys)
 
 
 def main():
@@ -222,7 +350,7 @@ def main():
                     help="Fields used to define 'same schedule' signature")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.input_csv, dtype=str, keep_default_na=False)
+    df = read_csv_strings(args.input_csv)
 
     # Required columns
     required_cols = {"post_id", "longitude", "latitude"}
@@ -233,91 +361,77 @@ def main():
     # Ensure lon/lat numeric
     df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
     df["latitude"]  = pd.to_numeric(df["latitude"], errors="coerce")
-    df = df.dropna(subset=["longitude", "latitude"]).copy()
+    df = df.dropna(subset=["longitude", "latitude"])
+    # Sort once so every post_id's rows are contiguous for the groupbys below
+    df = df.sort_values("post_id", kind="stable").reset_index(drop=True)
 
     # Group rows by post_id to build each meter's full schedule signature
-    meters = []
-    for pid, g in df.groupby("post_id", sort=False):
-        schedule_hash, schedule_entries = build_schedule_signature(g, args.signature_fields)
-        meters.append({
-            "post_id": pid,
-            "longitude": g["longitude"].astype(float).mean(),
-            "latitude": g["latitude"].astype(float).mean(),
-            "street_name": mode(g.get("street_name", [])) if "street_name" in g else "",
-            "street_num": mode(g.get("street_num", [])) if "street_num" in g else "",
-            "blockface_id": mode(g.get("blockface_id", [])) if "blockface_id" in g else "",
-            "cap_color": mode(g.get("cap_color", [])) if "cap_color" in g else "",
-            "schedule_hash": schedule_hash,
-            "schedule_json": json.dumps(schedule_entries, ensure_ascii=False),
-        })
-    mdf = pd.DataFrame(meters)
-
-    # For each schedule_hash, spatially cluster the meters
-    cluster_records = []
-    member_records = []
-
-    global_cluster_id = 0
-    for shash, g in mdf.groupby("schedule_hash", sort=False):
-        lats = g["latitude"].astype(float).tolist()
-        lons = g["longitude"].astype(float).tolist()
-        labels = cluster_points_haversine(lats, lons, args.radius_m)
-
-        # attach labels to group
-        g = g.copy()
-        g["local_cluster"] = labels
-
-        for lc, sub in g.groupby("local_cluster"):
-            global_cluster_id += 1
-            cid = f"C{global_cluster_id:05d}"
-            # centroid
-            clat = float(sub["latitude"].mean())
-            clon = float(sub["longitude"].mean())
-            # max radius from centroid (diagnostics)
-            max_r = 0.0
-            for _, r in sub.iterrows():
-                max_r = max(max_r, haversine_m(clat, clon, float(r["latitude"]), float(r["longitude"])))
-
-            # summarize human fields
-            street = mode(sub["street_name"]) if "street_name" in sub else ""
-            cap = mode(sub["cap_color"]) if "cap_color" in sub else ""
-            blockfaces = sorted({str(x) for x in sub.get("blockface_id", []) if str(x).strip()}) if "blockface_id" in sub else []
-            post_ids = sorted(sub["post_id"].astype(str).tolist())
-
-            cluster_records.append({
-                "cluster_id": cid,
-                "schedule_hash": shash,
-                "count_meters": len(sub),
-                "post_ids": "|".join(post_ids),
-                "centroid_latitude": clat,
-                "centroid_longitude": clon,
-                "approx_max_radius_m": round(max_r, 2),
-                "street_name_mode": street,
-                "cap_color_mode": cap,
-                "blockface_ids": "|".join(blockfaces),
-                "schedule_json": sub["schedule_json"].iloc[0],  # same for all in group
-            })
-
-            for _, r in sub.iterrows():
-                member_records.append({
-                    "cluster_id": cid,
-                    "post_id": r["post_id"],
-                    "latitude": float(r["latitude"]),
-                    "longitude": float(r["longitude"]),
-                    "street_name": r.get("street_name", ""),
-                    "street_num": r.get("street_num", ""),
-                    "blockface_id": r.get("blockface_id", ""),
-                    "cap_color": r.get("cap_color", ""),
-                    "schedule_hash": shash,
-                })
-
-    # Write outputs
-    cdf = pd.DataFrame(cluster_records)
-    mdf2 = pd.DataFrame(member_records)
-
-    cdf.to_csv(args.clusters_csv, index=False)
-    mdf2.to_csv(args.members_csv, index=False)
-
-    print(f"Wrote {len(cdf)} clusters to {args.clusters_csv} and {len(mdf2)} members to {args.members_csv}.")
+    sigs = schedule_signatures(df, args.signature_fields)
+    # One row per meter: mean position, most common descriptive fields, signature
+    mdf = df.groupby("post_id", sort=False)[["longitude", "latitude"]].mean()
+    mdf = mdf.join(group_modes(df, "post_id", ["street_name", "street_num", "blockface_id", "cap_color"]))
+    mdf = mdf.join(sigs).rename_axis("post_id").reset_index()
+
+    # Lay the meters out schedule by schedule so every schedule_hash group is a
+    # contiguous slice of one C-contiguous (N, 2) lat/lon array, clustered by view
+    hash_idx = mdf.groupby("schedule_hash", sort=False).ngroup().to_numpy()
+    order = np.argsort(hash_idx, kind="stable")
+    mdf = mdf.iloc[order].reset_index(drop=True)
+    hash_idx = hash_idx[order]
+    latlon = np.ascontiguousarray(mdf[["latitude", "longitude"]].to_numpy(np.float64))
+
+    # Spatially cluster each group; global_label orders clusters by schedule, then local label
+    global_label = np.empty(len(mdf), dtype=np.int64)
+    bounds = np.flatnonzero(np.diff(hash_idx)) + 1
+    for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(mdf)]):
+        labels = cluster_points_haversine(latlon[start:stop], args.radius_m)
+        global_label[start:stop] = (int(hash_idx[start]) << 32) | np.asarray(labels, dtype=np.int64)
+    mdf["global_label"] = global_label
+    labeled = mdf.sort_values("global_label", kind="stable")
+
+    # Summarize all clusters in one groupby
+    by_cluster = labeled.groupby("global_label")
+    cdf = by_cluster.agg(
+        schedule_hash=("schedule_hash", "first"),
+        count_meters=("post_id", "size"),
+        post_ids=("post_id", lambda s: "|".join(sorted(s.astype(str)))),
+        centroid_latitude=("latitude", "mean"),
+        centroid_longitude=("longitude", "mean"),
+        blockface_ids=("blockface_id", lambda s: "|".join(sorted({str(x) for x in s if str(x).strip()}))),
+        schedule_json=("schedule_json", "first"),  # same for all in group
+    )
+    cdf = cdf.join(group_modes(labeled, "global_label", ["street_name", "cap_color"])
+                   .add_suffix("_mode"))
+    # max radius from centroid (diagnostics)
+    centroids = by_cluster[["latitude", "longitude"]].transform("mean")
+    pts = latlon[labeled.index.to_numpy()]
+    dists = haversine_vec(centroids["latitude"].to_numpy(), centroids["longitude"].to_numpy(),
+                          pts[:, 0], pts[:, 1])
+    cdf["approx_max_radius_m"] = pd.Series(dists, index=labeled.index).groupby(labeled["global_label"]).max().round(2)
+    cdf["cluster_id"] = [f"C{i:05d}" for i in range(1, len(cdf) + 1)]
+    cdf = cdf[["cluster_id", "schedule_hash", "count_meters", "post_ids",
+               "centroid_latitude", "centroid_longitude", "approx_max_radius_m",
+               "street_name_mode", "cap_color_mode", "blockface_ids", "schedule_json"]]
+
+    labeled["cluster_id"] = labeled["global_label"].map(cdf["cluster_id"])
+
+    # Write outputs, streaming rows straight to the CSV writers
+    member_fields = ["cluster_id", "post_id", "latitude", "longitude", "street_name",
+                     "street_num", "blockface_id", "cap_color", "schedule_hash"]
+    with open(args.clusters_csv, "w", newline="", encoding="utf-8") as clusters_f, \
+            open(args.members_csv, "w", newline="", encoding="utf-8") as members_f:
+        clusters_w = csv.DictWriter(clusters_f, fieldnames=list(cdf.columns), lineterminator="\n")
+        members_w = csv.DictWriter(members_f, fieldnames=member_fields, lineterminator="\n")
+        clusters_w.writeheader()
+        members_w.writeheader()
+
+        for row in cdf.itertuples(index=False, name=None):
+            clusters_w.writerow(dict(zip(cdf.columns, row)))
+
+        for row in zip(*(labeled[f].tolist() for f in member_fields)):
+            members_w.writerow(dict(zip(member_fields, row)))
+
+    print(f"Wrote {len(cdf)} clusters to {args.clusters_csv} and {len(labeled)} members to {args.members_csv}.")
 
 if __name__ == "__main__":
     main()
@@ -24,15 +24,19 @@ Output columns (base mode):
   blockface_id, analysis_neighborhood, supervisor_district, on_offstreet_type,
   meter_type, meter_vendor, meter_model, jurisdiction
 
-Requires: pandas (pip install pandas)
+Requires: pandas (pip install pandas). Optional: pyarrow for faster, leaner CSV reading.
 """
 
 import argparse
-import re
-from datetime import datetime
-from typing import Optional, List
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional
+    pa = None
+
 DAY_ORDER = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
 DAY_LONG = {
     "Mo": "Monday",
@@ -43,79 +47,94 @@ DAY_LONG = {
     "Sa": "Saturday",
     "Su": "Sunday",
 }
-
-
-def parse_time(s: Optional[str]) -> Optional[str]:
-    """Parse a 12-hour time like '7:00 AM' -> '07:00'. Return None if empty."""
-    if s is None:
-        return None
-    s = str(s).strip()
-    if not s or s.lower() in {"nan", "none"}:
-        return None
-    # some inputs could be already 24h; try both
-    for fmt in ("%I:%M %p", "%H:%M"):
-        try:
-            t = datetime.strptime(s, fmt)
-            return t.strftime("%H:%M")
-        except ValueError:
-            continue
-    # Last resort: try without minutes (e.g., '7 AM')
-    for fmt in ("%I %p",):
-        try:
-            t = datetime.strptime(s, fmt)
-            return t.strftime("%H:%M")
-        except ValueError:
-            pass
-    return None
-
-
-def parse_days(s: Optional[str]) -> List[str]:
-    """Return normalized two-letter day abbreviations in canonical order."""
-    if not s or str(s).strip().lower() in {"nan", "none"}:
-        return []
-    parts = [p.strip() for p in str(s).split(",") if p.strip()]
-    parts = [p[:2].title() for p in parts]  # normalize case/length
+DAY_RANK = {d: i for i, d in enumerate(DAY_ORDER)}
+
+
+def parse_times(times: pd.Series) -> pd.Series:
+    """Parse 12-hour times like '7:00 AM' -> '07:00', column-wise. Empty/unparseable -> NaN."""
+    s = times.astype(str).str.strip()
+    t = pd.to_datetime(s, format="%I:%M %p", errors="coerce")
+    # some inputs could be already 24h; last resort: without minutes (e.g., '7 AM')
+    for fmt in ("%H:%M", "%I %p"):
+        m = t.isna()
+        t[m] = pd.to_datetime(s[m], format=fmt, errors="coerce")
+    return t.dt.strftime("%H:%M")
+
+
+def parse_days(days: pd.Series) -> pd.Series:
+    """
+    Return normalized two-letter day abbreviations in canonical order, one entry per
+    (row, day) and indexed by row position. Rows without any valid day get one NaN entry.
+    """
+    parts = days.fillna("").astype(str).reset_index(drop=True).str.split(",").explode()
+    parts = parts.str.strip().str[:2].str.title()  # normalize case/length
     # Keep only valid abbreviations and preserve DAY_ORDER ordering
-    uniq = []
-    for d in DAY_ORDER:
-        if d in parts:
-            uniq.append(d)
-    return uniq
-
-
-def parse_time_limit_minutes(s: Optional[str]) -> Optional[int]:
-    if s is None:
-        return None
-    m = re.search(r"(\d+)", str(s))
-    return int(m.group(1)) if m else None
-
-
-def derive_meter_state(schedule_type: str, applied_rule: Optional[str], cap_color: Optional[str]) -> str:
-    st = (schedule_type or "").strip().lower()
-    rule = (applied_rule or "").strip()
-    rule_l = rule.lower()
-    color = (cap_color or "").strip()
-
-    if "tow" in st:
-        return "Tow-away"
-    if "operating" in st or "operate" in st:
-        if "commercial" in rule_l:
-            return "Commercial Loading (metered)"
-        if "general metered" in rule_l or "general" in rule_l:
-            return "General Metered"
-        if rule:
-            return rule
-        return "Metered"
-    if "alternate" in st:
-        return f"Alternate: {rule or color or 'Rule'}"
+    parts = parts[parts.isin(DAY_ORDER)]
+    found = pd.DataFrame({"pos": parts.index, "day": parts.to_numpy(), "rank": parts.map(DAY_RANK).to_numpy()})
+    empty = np.setdiff1d(np.arange(len(days)), found["pos"].to_numpy())
+    found = pd.concat([found, pd.DataFrame({"pos": empty, "day": np.nan, "rank": -1})], ignore_index=True)
+    found = found.drop_duplicates(["pos", "day"]).sort_values(["pos", "rank"], kind="stable")
+    return pd.Series(found["day"].to_numpy(), index=found["pos"].to_numpy())
+
+
+def derive_meter_states(schedule_type: pd.Series, applied_rule: pd.Series, cap_color: pd.Series) -> pd.Series:
+    schedule_type = schedule_type.fillna("")
+    st = schedule_type.str.strip().str.lower()
+    rule = applied_rule.fillna("").str.strip()
+    rule_l = rule.str.lower()
+    color = cap_color.fillna("").str.strip()
+
+    has_rule = rule != ""
+    is_operating = st.str.contains("operating", regex=False) | st.str.contains("operate", regex=False)
+    conditions = [
+        st.str.contains("tow", regex=False),
+        is_operating & rule_l.str.contains("commercial", regex=False),
+        is_operating & rule_l.str.contains("general", regex=False),
+        is_operating & has_rule,
+        is_operating,
+        st.str.contains("alternate", regex=False),
+    ]
+    rule_or_color = rule.where(has_rule, color)
+    choices = [
+        "Tow-away",
+        "Commercial Loading (metered)",
+        "General Metered",
+        rule,
+        "Metered",
+        "Alternate: " + rule_or_color.where(rule_or_color != "", "Rule"),
+    ]
     # fallback
-    return (schedule_type or rule or color or "Schedule").strip()
+    fallback = schedule_type.where(schedule_type != "", rule_or_color.where(rule_or_color != "", "Schedule")).str.strip()
+    return pd.Series(np.select(conditions, choices, default=fallback), index=schedule_type.index)
 
 
 def clean_columns(df: pd.DataFrame) -> pd.DataFrame:
     # Strip whitespace from headers and cell values
     df = df.rename(columns={c: c.strip() for c in df.columns})
-    return df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+    for c in df.select_dtypes(include=["object", "string"]).columns:
+        df[c] = df[c].str.strip()
+    return df
+
+
+def read_csv_strings(path: str) -> pd.DataFrame:
+    """
+    Read a CSV with every column as text and empty cells as ''.
+    With pyarrow, uses its multithreaded reader and Arrow-backed strings; column types
+    are pinned to string up front so values like '09:00' are never inferred as times.
+    """
+    if pa is None:
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    names = pa_csv.open_csv(path).schema.names
+    table = pa_csv.read_csv(
+        path,
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={n: pa.string() for n in names},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
 
 
 def main():
@@ -127,8 +146,8 @@ def main():
     args = ap.parse_args()
 
     # Load
-    sched = pd.read_csv(args.schedule_csv, dtype=str, keep_default_na=False)
-    meters = pd.read_csv(args.meters_csv, dtype=str, keep_default_na=False)
+    sched = read_csv_strings(args.schedule_csv)
+    meters = read_csv_strings(args.meters_csv)
 
     sched = clean_columns(sched)
     meters = clean_columns(meters)
@@ -155,22 +174,16 @@ def main():
     s = sched.rename(columns=col_map).copy()
 
     # Normalize
-    s["from_time"] = s.pop("from_time_raw").apply(parse_time)
-    s["to_time"] = s.pop("to_time_raw").apply(parse_time)
-    s["priority"] = s["priority"].apply(lambda x: int(re.search(r"\d+", x).group(0)) if re.search(r"\d+", str(x)) else None)
-    s["time_limit_min"] = s.pop("time_limit_raw").apply(parse_time_limit_minutes)
+    s["from_time"] = parse_times(s.pop("from_time_raw"))
+    s["to_time"] = parse_times(s.pop("to_time_raw"))
+    s["priority"] = s["priority"].astype(str).str.extract(r"(\d+)", expand=False).astype("Int64")
+    s["time_limit_min"] = s.pop("time_limit_raw").astype(str).str.extract(r"(\d+)", expand=False).astype("Int64")
 
     # Clean applied_rule "-" noise
-    s["applied_rule"] = s["applied_rule"].apply(lambda x: None if (not x or x.strip(" -") == "") else x)
+    s["applied_rule"] = s["applied_rule"].mask(s["applied_rule"].fillna("").str.strip(" -") == "")
 
     # Derive state
-    s["meter_state"] = s.apply(
-        lambda r: derive_meter_state(r.get("schedule_type"), r.get("applied_rule"), r.get("cap_color_sched")),
-        axis=1,
-    )
-
-    # Standardize days for sorting; keep original string too
-    s["days_norm"] = s["days"].apply(parse_days)
+    s["meter_state"] = derive_meter_states(s["schedule_type"], s["applied_rule"], s["cap_color_sched"])
 
     # Prepare meters subset for merge
     keep_cols = {
@@ -255,10 +268,9 @@ def main():
 
     if args.explode_days:
         # Expand to one row per day with a new 'day' column (long name)
-        out["days_list"] = out["days"].apply(parse_days)
-        out = out.explode("days_list", ignore_index=True)
-        out["day"] = out["days_list"].map(DAY_LONG).fillna("")
-        out.drop(columns=["days_list"], inplace=True)
+        days_list = parse_days(out["days"])
+        out = out.iloc[days_list.index].reset_index(drop=True)
+        out["day"] = days_list.map(DAY_LONG).fillna("").to_numpy()
         # Optional: reorder to put 'day' next to 'days'
         cols = out.columns.tolist()
         if "day" in cols and "days" in cols: